@@ -0,0 +1,257 @@
+"""Deriv copy trader built on the python-deriv-api library.
+
+Listens to a source account's transaction stream and replicates each
+contract onto one or more destination accounts, scaling the stake by the
+balance ratio between source and destination.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict
+
+from deriv_api import DerivAPI
+
+try:
+    import uvloop
+except ImportError:
+    # uvloop is not available on Windows; the default loop is used there.
+    uvloop = None
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+class DerivCopyTrader:
+    """Replicates contracts from a source account onto destinations."""
+
+    def __init__(self, app_id, source_token, destination_configs):
+        self.app_id = app_id
+        self.source_token = source_token
+        # Each config: {"token": ..., "lot_scale": ...}
+        self.destination_configs = destination_configs
+
+        self.source_client = None
+        self.destination_clients = {}  # token -> DerivAPI
+        # Clients in registration order, parallel to destination_configs,
+        # so the fan-out loop iterates a flat list instead of doing dict
+        # lookups per destination per trade. The dict above stays for the
+        # token-keyed paths (updates and closes).
+        self._dest_clients = []
+        # token -> DerivAPI, kept for the lifetime of the process so a
+        # reconnect reuses the existing transport instead of paying a new
+        # TCP+TLS handshake per DerivAPI construction.
+        self._client_pool = {}
+
+        # copied contract id -> details of the copy
+        self.active_trades = {}
+        # source trade id -> [(copied contract id, destination token)] so a
+        # source-side update finds its copies in O(1) instead of scanning
+        # every active trade.
+        self.trades_by_source = defaultdict(list)
+
+        # token -> (balance, expiry from time.monotonic()); balances move
+        # on the order of seconds, so a short TTL saves two round-trips on
+        # every copied trade.
+        self._balance_cache = {}
+        self.balance_ttl = 3.0
+
+        self.running = False
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+
+    async def _client_for(self, token):
+        """Authorized client for a token, reusing the pooled instance."""
+        client = self._client_pool.get(token)
+        if client is None:
+            client = DerivAPI(app_id=self.app_id)
+            self._client_pool[token] = client
+        await client.authorize(token)
+        return client
+
+    async def connect(self):
+        self.source_client = await self._client_for(self.source_token)
+        logger.info("Source account authorized")
+        self._dest_clients = []
+        for config in self.destination_configs:
+            client = await self._client_for(config["token"])
+            self.destination_clients[config["token"]] = client
+            self._dest_clients.append(client)
+        logger.info(f"Connected {len(self.destination_clients)} "
+                    f"destination account(s)")
+
+    async def stop(self):
+        self.running = False
+        for client in self._client_pool.values():
+            await client.disconnect()
+        self._client_pool.clear()
+        self.source_client = None
+
+    # ------------------------------------------------------------------
+    # Balance / sizing
+    # ------------------------------------------------------------------
+
+    async def get_account_balance(self, client):
+        response = await client.balance()
+        return float(response["balance"]["balance"])
+
+    async def _balance(self, client, token):
+        """Account balance via the short-TTL cache."""
+        cached = self._balance_cache.get(token)
+        now = time.monotonic()
+        if cached is not None and now < cached[1]:
+            return cached[0]
+        balance = await self.get_account_balance(client)
+        self._balance_cache[token] = (balance, now + self.balance_ttl)
+        return balance
+
+    async def calculate_scaled_lot_size(self, dest_client, config, amount):
+        source_balance = await self._balance(
+            self.source_client, self.source_token)
+        destination_balance = await self._balance(
+            dest_client, config["token"])
+        if source_balance <= 0:
+            return amount
+        scale = (destination_balance / source_balance) * config.get(
+            "lot_scale", 1.0)
+        return round(amount * scale, 2)
+
+    # ------------------------------------------------------------------
+    # Trade replication
+    # ------------------------------------------------------------------
+
+    async def copy_trade(self, trade_details):
+        # Fan out to every destination at once so total latency is the
+        # slowest round-trip, not the sum of them.
+        results = await asyncio.gather(
+            *(self._execute_trade_copy(client, config, trade_details)
+              for config, client in zip(self.destination_configs,
+                                        self._dest_clients)),
+            return_exceptions=True,
+        )
+        for config, result in zip(self.destination_configs, results):
+            if isinstance(result, Exception):
+                logger.error(f"Copy to destination "
+                             f"{config['token'][:6]}... failed: {result}")
+
+    async def _execute_trade_copy(self, client, config, trade_details):
+        amount = await self.calculate_scaled_lot_size(
+            client, config, trade_details["amount"])
+        proposal = await client.proposal({
+            "proposal": 1,
+            "amount": amount,
+            "basis": "stake",
+            "contract_type": trade_details["contract_type"],
+            "currency": trade_details.get("currency", "USD"),
+            "duration": trade_details.get("duration", 5),
+            "duration_unit": trade_details.get("duration_unit", "t"),
+            "symbol": trade_details["symbol"],
+        })
+        buy = await client.buy({
+            "buy": proposal["proposal"]["id"],
+            "price": amount,
+        })
+        copied_trade = buy["buy"]
+        copied_id = copied_trade["contract_id"]
+        self.active_trades[copied_id] = {
+            "source_trade_id": trade_details["id"],
+            "destination_token": config["token"],
+            "symbol": trade_details["symbol"],
+            "amount": amount,
+        }
+        self.trades_by_source[trade_details["id"]].append(
+            (copied_id, config["token"]))
+        logger.info(f"Copied trade {trade_details['id']} -> {copied_id}")
+
+    async def update_trade_parameters(self, trade_update):
+        """Apply a source-side limit-order change to every copy of it."""
+        for copied_id, dest_token in self.trades_by_source.get(
+                trade_update["id"], ()):
+            client = self.destination_clients.get(dest_token)
+            if client is None:
+                continue
+            try:
+                await client.contract_update({
+                    "contract_update": 1,
+                    "contract_id": copied_id,
+                    "limit_order": trade_update.get("limit_order", {}),
+                })
+            except Exception as exc:
+                logger.error(f"Failed to update copy {copied_id}: {exc}")
+
+    async def close_trade(self, source_trade_id):
+        """Sell every copy of a source trade and drop it from the books."""
+        for copied_id, dest_token in self.trades_by_source.pop(
+                source_trade_id, ()):
+            self.active_trades.pop(copied_id, None)
+            client = self.destination_clients.get(dest_token)
+            if client is None:
+                continue
+            try:
+                await client.sell({"sell": copied_id, "price": 0})
+            except Exception as exc:
+                logger.error(f"Failed to close copy {copied_id}: {exc}")
+
+    # ------------------------------------------------------------------
+    # Source stream
+    # ------------------------------------------------------------------
+
+    async def listen_trades(self):
+        self.running = True
+        await self.source_client.subscribe({"transaction": 1, "subscribe": 1})
+        # Balance pushes keep the source side of the cache warm without
+        # polling; destinations refresh through the TTL.
+        await self.source_client.subscribe({"balance": 1, "subscribe": 1})
+        while self.running:
+            message = await self.source_client.listen()
+            if "balance" in message:
+                self._balance_cache[self.source_token] = (
+                    float(message["balance"]["balance"]),
+                    time.monotonic() + self.balance_ttl,
+                )
+                continue
+            if "transaction" not in message:
+                continue
+            transaction = message["transaction"]
+            action = transaction.get("action")
+            if action == "buy":
+                await self.copy_trade({
+                    "id": str(transaction.get("contract_id")),
+                    "amount": float(transaction.get("amount", 0)),
+                    "contract_type": transaction.get("contract_type", "CALL"),
+                    "symbol": transaction.get("symbol"),
+                    "currency": transaction.get("currency", "USD"),
+                })
+            elif action == "sell":
+                await self.close_trade(str(transaction.get("contract_id")))
+
+
+async def main():
+    destination_tokens = [
+        token for token in
+        os.environ.get("DERIV_DESTINATION_TOKENS", "").split(",") if token
+    ]
+    trader = DerivCopyTrader(
+        app_id=os.environ.get("DERIV_APP_ID", "1089"),
+        source_token=os.environ.get("DERIV_SOURCE_TOKEN", ""),
+        destination_configs=[
+            {"token": token, "lot_scale": 1.0} for token in destination_tokens
+        ],
+    )
+    await trader.connect()
+    try:
+        await trader.listen_trades()
+    finally:
+        await trader.stop()
+
+
+if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.install()
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+"""Copy trades between MT5 accounts through a local MetaTrader5 terminal.
+
+Polls the source account's open positions, diffs them against the set of
+already-copied tickets, and replicates only genuinely new positions onto
+each destination account.
+"""
+
+import os
+import time
+
+import MetaTrader5 as mt5
+
+source_account = {
+    "login": int(os.environ.get("MT5_SOURCE_LOGIN", "0")),
+    "password": os.environ.get("MT5_SOURCE_PASSWORD", ""),
+    "server": os.environ.get("MT5_SOURCE_SERVER", ""),
+}
+
+# Add more destination accounts here as needed.
+destination_accounts = [
+    {
+        "login": int(os.environ.get("MT5_DEST_LOGIN", "0")),
+        "password": os.environ.get("MT5_DEST_PASSWORD", ""),
+        "server": os.environ.get("MT5_DEST_SERVER", ""),
+    },
+]
+
+POLL_INTERVAL = 0.05
+TICK_TTL = 0.05
+
+_tick_cache = {}
+_current_login = None
+
+
+def connect_to_account(account):
+    """Log the terminal into an account, skipping the round-trip when it
+    is already the active login."""
+    global _current_login
+    if _current_login == account["login"]:
+        return True
+    if not mt5.login(account["login"], password=account["password"],
+                     server=account["server"]):
+        print(f"Failed to connect to account {account['login']}: "
+              f"{mt5.last_error()}")
+        _current_login = None
+        return False
+    _current_login = account["login"]
+    return True
+
+
+def get_tick(symbol):
+    """symbol_info_tick with a short TTL so a burst of copies of the same
+    symbol shares one terminal query."""
+    cached = _tick_cache.get(symbol)
+    now = time.monotonic()
+    if cached is not None and now - cached[1] < TICK_TTL:
+        return cached[0]
+    tick = mt5.symbol_info_tick(symbol)
+    _tick_cache[symbol] = (tick, now)
+    return tick
+
+
+def calculate_lot_size(trade, source_balance):
+    """Scale the volume by the destination/source balance ratio.
+
+    Must be called after the terminal has switched to the destination
+    account so account_info() reflects the destination balance.
+    """
+    destination_balance = mt5.account_info().balance
+    if source_balance == 0:
+        return trade.volume
+    return round(trade.volume * (destination_balance / source_balance), 2)
+
+
+def copy_trade(trade, account, source_balance):
+    if not connect_to_account(account):
+        return
+    tick = get_tick(trade.symbol)
+    if tick is None:
+        print(f"No tick data for {trade.symbol}, skipping")
+        return
+    request = {
+        "action": mt5.TRADE_ACTION_DEAL,
+        "symbol": trade.symbol,
+        "volume": calculate_lot_size(trade, source_balance),
+        "type": trade.type,
+        "price": tick.ask if trade.type == mt5.ORDER_TYPE_BUY else tick.bid,
+        "deviation": 20,
+        "magic": 234000,
+        "comment": "copy trade",
+        "type_time": mt5.ORDER_TIME_GTC,
+        "type_filling": mt5.ORDER_FILLING_IOC,
+    }
+    result = mt5.order_send(request)
+    if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+        print(f"Copy of ticket {trade.ticket} to {account['login']} "
+              f"failed: {result}")
+    else:
+        print(f"Copied ticket {trade.ticket} to {account['login']}")
+
+
+def main():
+    if not mt5.initialize():
+        print(f"MT5 initialize failed: {mt5.last_error()}")
+        return
+    # Validate every account once up front instead of discovering bad
+    # credentials in the middle of the copy loop.
+    for account in [source_account] + destination_accounts:
+        if not connect_to_account(account):
+            mt5.shutdown()
+            return
+
+    seen_tickets = set()
+    try:
+        while True:
+            if not connect_to_account(source_account):
+                # Still logged into the last destination; reading balance
+                # or positions now would replicate the destination onto
+                # itself, so skip this pass and retry.
+                time.sleep(POLL_INTERVAL)
+                continue
+            source_balance = mt5.account_info().balance
+            trades = mt5.positions_get() or ()
+            open_tickets = {trade.ticket for trade in trades}
+            for trade in trades:
+                if trade.ticket in seen_tickets:
+                    continue
+                for account in destination_accounts:
+                    copy_trade(trade, account, source_balance)
+                seen_tickets.add(trade.ticket)
+            # Forget closed tickets so they can be copied again if reopened.
+            seen_tickets &= open_tickets
+            time.sleep(POLL_INTERVAL)
+    finally:
+        mt5.shutdown()
+
+
+if __name__ == "__main__":
+    main()
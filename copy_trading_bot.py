@@ -0,0 +1,658 @@
+"""Deriv MT5 copy trading bot.
+
+Mirrors trades from a source Deriv MT5 account onto a destination MT5
+account over the Deriv WebSocket API. Both roles share one WebSocket on
+a single asyncio event loop: the destination token is authorized on the
+same connection after the source, and outbound orders are scoped by
+loginid. The socket is reconnected with exponential backoff when it
+drops.
+"""
+
+import asyncio
+import itertools
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import signal
+import socket
+import time
+from collections import OrderedDict
+
+import orjson
+import websockets
+
+try:
+    import uvloop
+except ImportError:
+    # uvloop is not available on Windows; the default loop is used there.
+    uvloop = None
+
+
+def _jnum(value):
+    """Numeric JSON fragment for the order templates."""
+    return b"null" if value is None else str(value).encode()
+
+
+def _tune_socket(ws):
+    """Disable Nagle and widen the send buffer on a live connection.
+
+    Order frames are small and latency-sensitive; with Nagle on they can
+    sit coalescing behind an unacked segment for up to ~40 ms.
+    """
+    sock = ws.transport.get_extra_info("socket")
+    if sock is None:
+        return
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+
+
+def _setup_logging():
+    """Route log records through a queue so I/O happens off the loop."""
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, handler)
+    listener.start()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+
+_setup_logging()
+logger = logging.getLogger(__name__)
+
+
+class DerivMT5CopyTradingBot:
+    """Copies MT5 trades from one Deriv account to another."""
+
+    def __init__(self, app_id, source_token, destination_token,
+                 source_mt5_account=None, destination_mt5_account=None,
+                 lot_multiplier=1.0):
+        self.ws_url = f"wss://ws.binaryws.com/websockets/v3?app_id={app_id}"
+        self.source_token = source_token
+        self.destination_token = destination_token
+        self.source_mt5_account = source_mt5_account
+        self.destination_mt5_account = destination_mt5_account
+        self.lot_multiplier = lot_multiplier
+
+        # Both roles share one socket; the aliases exist so the order
+        # sender and reconnect logic read naturally.
+        self.source_ws = None
+        self.destination_ws = None
+        self.source_loginid = None
+        self.destination_loginid = None
+        self.source_mt5_login = None
+        self.destination_mt5_login = None
+
+        self.ping_interval = 15
+        self.retry_delay = 5
+        self.reconnect_cap = 60
+        # Consecutive failed connects; reset once an authorize succeeds so
+        # one long outage does not penalize the next brief blip.
+        self._connect_attempts = 0
+        self.stop_event = asyncio.Event()
+        # DISCONNECTED -> CONNECTING -> AUTHORIZED, guarded by a lock so
+        # exactly one (re)connect can ever be in flight; concurrent
+        # supervisors were how flaps used to double-replicate trades.
+        self._conn_state = "DISCONNECTED"
+        self._conn_lock = asyncio.Lock()
+
+        # Monotonic request ids; time.time() only has 1-second granularity
+        # so it produced duplicate ids for trades in the same second.
+        self._req_id = itertools.count(1)
+        self._pending_responses = {}  # req_id -> Future for the reply
+
+        # Fixed request payloads serialized once here; subscribe payloads
+        # depend on the resolved loginid so they are cached on first use.
+        # Authorize replies mask the token in echo_req ("<not shown>"),
+        # so each payload carries a fixed req_id and the responses are
+        # attributed by that instead of the echoed secret.
+        self._src_auth_req_id = next(self._req_id)
+        self._dst_auth_req_id = next(self._req_id)
+        self._src_auth = orjson.dumps(
+            {"authorize": source_token, "req_id": self._src_auth_req_id})
+        self._dst_auth = orjson.dumps(
+            {"authorize": destination_token,
+             "req_id": self._dst_auth_req_id})
+        self._mt5_list_req = b'{"mt5_login_list": 1}'
+        self._subscribe_cache = {}
+        # Snapshot requests serialized once the source login is known.
+        self._positions_req = None
+        self._orders_req = None
+        # Order-request byte templates; everything but the per-trade
+        # fields is baked in once the destination login is known, so the
+        # hot path interpolates instead of encoding a dict.
+        self._trade_tmpl = None
+        self._order_tmpl = None
+
+        # Outbound orders are queued and flushed in batches so a burst of
+        # positions shares one sender wakeup instead of paying a separate
+        # send per transaction. The bound caps memory under sustained
+        # overload; beyond it the oldest order is shed.
+        self._pending_orders = asyncio.Queue(maxsize=1024)
+        self.max_batch_size = 32
+        self.ack_timeout = 5
+
+        # Small pool of pre-authorized destination sockets so an order
+        # never waits behind a fresh TCP+TLS+authorize handshake after a
+        # blip; the filler rotates the oldest one out periodically.
+        self._dest_pool = asyncio.Queue(maxsize=3)
+        self.pool_rotate_interval = 600
+        # When both tokens resolve to the same loginid there is no point
+        # in dedicated destination sockets; orders ride the shared one.
+        self._same_user = False
+
+        # Inbound trade events are handed off to a bounded queue so the
+        # socket reader keeps draining while the replicator works; a full
+        # queue drops the oldest event rather than stalling the reader.
+        self._trade_q = asyncio.Queue(maxsize=10_000)
+        self.dropped_messages = 0
+
+        # The positions/orders subscriptions re-emit the full array on
+        # every change, so already-copied entries are remembered and only
+        # genuinely new ones replicated. Capped so pathological flows
+        # cannot grow them without bound.
+        self._seen_positions = OrderedDict()
+        self._seen_orders = OrderedDict()
+        self.seen_cap = 4096
+
+        # target account number -> resolved login, so reconnects skip the
+        # account-list scan entirely.
+        self._account_cache = {}
+
+        # Deriv sets msg_type on every frame, so inbound dispatch is a
+        # single dict lookup instead of a chain of membership tests.
+        self._handlers = {
+            "authorize": self._handle_authorize,
+            "mt5_login_list": self._handle_mt5_login_list,
+            "transaction": self._handle_transaction,
+            "mt5_get_positions": self._handle_positions,
+            "mt5_get_orders": self._handle_orders,
+            "mt5_new_order": self._handle_new_order,
+        }
+
+    # ------------------------------------------------------------------
+    # Connection handling
+    # ------------------------------------------------------------------
+
+    async def run_socket(self):
+        """Open the shared socket and keep it alive, reconnecting with
+        jittered exponential backoff. All socket handoffs happen under
+        _conn_lock so only one connection is ever live."""
+        while not self.stop_event.is_set():
+            async with self._conn_lock:
+                if self._conn_state != "DISCONNECTED":
+                    logger.warning("Connection already owned, "
+                                   "supervisor exiting")
+                    return
+                self._conn_state = "CONNECTING"
+            try:
+                async with websockets.connect(
+                    self.ws_url, ping_interval=self.ping_interval,
+                    ping_timeout=10, open_timeout=5, compression="deflate",
+                ) as ws:
+                    _tune_socket(ws)
+                    async with self._conn_lock:
+                        self.source_ws = ws
+                        self.destination_ws = ws
+                    logger.info("Connection established")
+                    await ws.send(self._src_auth)
+                    async for raw in ws:
+                        await self.on_message(ws, raw)
+            except (websockets.ConnectionClosed, OSError) as exc:
+                logger.warning(f"Connection dropped: {exc}")
+            finally:
+                async with self._conn_lock:
+                    self.source_ws = None
+                    self.destination_ws = None
+                    self._conn_state = "DISCONNECTED"
+            # Jitter keeps a fleet of bots from reconnecting in lockstep
+            # when Deriv briefly rejects connections.
+            delay = min(self.reconnect_cap,
+                        self.retry_delay * 2 ** self._connect_attempts)
+            delay += random.uniform(0, 0.5)
+            self._connect_attempts += 1
+            logger.info(f"Reconnecting in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def _new_dest_conn(self):
+        """Open and authorize a fresh destination socket."""
+        ws = await websockets.connect(
+            self.ws_url, ping_interval=self.ping_interval, ping_timeout=10,
+            open_timeout=5, compression="deflate")
+        _tune_socket(ws)
+        try:
+            await ws.send(self._dst_auth)
+            while True:
+                raw = await asyncio.wait_for(ws.recv(), timeout=10)
+                data = orjson.loads(raw)
+                if "error" in data:
+                    raise OSError(f"Destination authorize failed: "
+                                  f"{data['error'].get('message')}")
+                if data.get("msg_type") == "authorize":
+                    return ws
+        except BaseException:
+            await ws.close()
+            raise
+
+    async def _pool_filler(self):
+        """Keep the destination pool topped up with warm sockets."""
+        last_rotation = time.monotonic()
+        while not self.stop_event.is_set():
+            if self._same_user:
+                # Orders go over the shared socket; no pool needed.
+                await asyncio.sleep(1)
+                continue
+            if self._dest_pool.full():
+                if (time.monotonic() - last_rotation
+                        >= self.pool_rotate_interval):
+                    # Retire the oldest socket; the refill below replaces
+                    # it without the order path ever paying the handshake.
+                    stale = self._dest_pool.get_nowait()
+                    await stale.close()
+                    last_rotation = time.monotonic()
+                    continue
+                await asyncio.sleep(1)
+                continue
+            try:
+                ws = await self._new_dest_conn()
+            except (OSError, asyncio.TimeoutError,
+                    websockets.WebSocketException) as exc:
+                logger.warning(f"Failed to pre-warm destination "
+                               f"connection: {exc}")
+                await asyncio.sleep(self.retry_delay)
+                continue
+            # The sender may have returned a checked-out socket while the
+            # handshake above was in flight, so the pool can be full again
+            # here; block instead of crashing on put_nowait.
+            await self._dest_pool.put(ws)
+
+    async def report_queue_depth(self):
+        """Periodically report replication backlog."""
+        while not self.stop_event.is_set():
+            await asyncio.sleep(30)
+            if self._trade_q.qsize():
+                logger.info(f"Trade queue depth: {self._trade_q.qsize()} "
+                            f"(dropped {self.dropped_messages})")
+
+    # ------------------------------------------------------------------
+    # Message handling
+    # ------------------------------------------------------------------
+
+    async def on_message(self, ws, message):
+        data = orjson.loads(message)
+        logger.debug("Message received: %r", data)
+
+        # Resolve the matching future first so request/response callers
+        # see error frames too instead of waiting out their timeout.
+        req_id = data.get("req_id")
+        if req_id is not None:
+            future = self._pending_responses.pop(req_id, None)
+            if future is not None and not future.done():
+                future.set_result(data)
+
+        if "error" in data:
+            logger.error(f"API error: {data['error'].get('message')}")
+            return
+
+        handler = self._handlers.get(data.get("msg_type"))
+        if handler is not None:
+            await handler(ws, data)
+
+    async def _handle_mt5_login_list(self, ws, data):
+        accounts = data["mt5_login_list"]
+        self.source_mt5_login = self.select_mt5_account(
+            accounts, self.source_mt5_account)
+        self.destination_mt5_login = self.select_mt5_account(
+            accounts, self.destination_mt5_account)
+        logger.info(f"Using MT5 accounts {self.source_mt5_login} -> "
+                    f"{self.destination_mt5_login}")
+        self._positions_req = orjson.dumps(
+            {"mt5_get_positions": 1, "login": self.source_mt5_login})
+        self._orders_req = orjson.dumps(
+            {"mt5_get_orders": 1, "login": self.source_mt5_login})
+        self._build_order_templates()
+        await self.subscribe_to_mt5_trades(ws)
+
+    async def _handle_transaction(self, ws, data):
+        logger.debug("Source transaction: %r", data["transaction"])
+        await ws.send(self._positions_req)
+        await ws.send(self._orders_req)
+
+    async def _handle_positions(self, ws, data):
+        positions = self._filter_new(
+            data["mt5_get_positions"].get("positions", []),
+            self._seen_positions, "position_id")
+        logger.info("MT5 positions update: %d new", len(positions))
+        if positions:
+            self._enqueue_trade_event(("positions", positions))
+
+    async def _handle_orders(self, ws, data):
+        orders = self._filter_new(
+            data["mt5_get_orders"].get("orders", []),
+            self._seen_orders, "order_id")
+        if orders:
+            self._enqueue_trade_event(("orders", orders))
+
+    def _filter_new(self, items, seen, id_key):
+        """Keep only items not yet copied, and forget items missing from
+        this snapshot so a close/reopen can trigger again."""
+        fresh = []
+        current = set()
+        for item in items:
+            key = item.get(id_key) or (f"{item.get('symbol')}|"
+                                       f"{item.get('open_time')}|"
+                                       f"{item.get('volume')}")
+            current.add(key)
+            if key in seen:
+                continue
+            seen[key] = True
+            if len(seen) > self.seen_cap:
+                seen.popitem(last=False)
+            fresh.append(item)
+        for key in [k for k in seen if k not in current]:
+            del seen[key]
+        return fresh
+
+    async def _handle_new_order(self, ws, data):
+        logger.info(f"Order placed on destination: {data['mt5_new_order']}")
+
+    async def _handle_authorize(self, ws, data):
+        loginid = data["authorize"].get("loginid")
+        # echo_req masks the token, so the branches key on the req_id
+        # baked into each authorize payload.
+        req_id = data.get("req_id")
+        if req_id == self._src_auth_req_id:
+            self._connect_attempts = 0
+            self._conn_state = "AUTHORIZED"
+            self.source_loginid = loginid
+            logger.info(f"Source account authorized: {loginid}")
+            if self.destination_token != self.source_token:
+                # Chain the destination authorization onto the same socket;
+                # subsequent requests are scoped by loginid.
+                await ws.send(self._dst_auth)
+            else:
+                self.destination_loginid = loginid
+                self._same_user = True
+                await self.get_mt5_accounts(ws)
+        elif req_id == self._dst_auth_req_id:
+            self.destination_loginid = loginid
+            # The destination authorize is chained after the source one,
+            # so source_loginid is resolved by now; a None compare must
+            # still never count as "same user".
+            self._same_user = (self.source_loginid is not None
+                               and loginid == self.source_loginid)
+            if not self._same_user:
+                logger.info("Tokens map to different accounts, using "
+                            "dedicated destination sockets")
+            logger.info(f"Destination account authorized: {loginid}")
+            await self.get_mt5_accounts(ws)
+        else:
+            logger.warning(f"Unexpected authorize response "
+                           f"(req_id={req_id}), ignoring")
+
+    def _expect_response(self, req_id):
+        """Future resolved when the reply tagged with req_id arrives."""
+        future = asyncio.get_running_loop().create_future()
+        self._pending_responses[req_id] = future
+        return future
+
+    def _reap_acks(self, req_ids):
+        """Drop any still-unresolved ack futures so the map cannot leak."""
+        for req_id in req_ids:
+            future = self._pending_responses.pop(req_id, None)
+            if future is not None and not future.done():
+                future.cancel()
+
+    def _enqueue_trade_event(self, event):
+        try:
+            self._trade_q.put_nowait(event)
+        except asyncio.QueueFull:
+            # Shed the oldest event: a fresher snapshot supersedes it.
+            self._trade_q.get_nowait()
+            self._trade_q.put_nowait(event)
+            self.dropped_messages += 1
+            logger.warning(f"Trade queue full, dropped oldest event "
+                           f"({self.dropped_messages} total)")
+
+    async def _replicator(self):
+        """Drain the trade queue and dispatch replication off the reader."""
+        while not self.stop_event.is_set():
+            kind, items = await self._trade_q.get()
+            if kind == "positions":
+                for position in items:
+                    await self.replicate_mt5_trade(position)
+            else:
+                for order in items:
+                    await self.replicate_mt5_order(order)
+
+    async def get_mt5_accounts(self, ws):
+        await ws.send(self._mt5_list_req)
+
+    async def subscribe_to_mt5_trades(self, ws):
+        payload = self._subscribe_cache.get(self.source_mt5_login)
+        if payload is None:
+            payload = orjson.dumps({
+                "transaction": 1,
+                "subscribe": 1,
+                "loginid": self.source_mt5_login,
+                # Drawn from the shared counter so subscription pushes can
+                # never collide with an order's req_id; caching keeps it
+                # stable per login, which is fine — it only needs to be
+                # unique, not fresh per send.
+                "req_id": next(self._req_id),
+            })
+            self._subscribe_cache[self.source_mt5_login] = payload
+        # One transaction stream carries both position and order changes;
+        # subscribing twice only doubled the inbound volume.
+        await ws.send(payload)
+        logger.info("Subscribed to source MT5 trade updates")
+
+    # ------------------------------------------------------------------
+    # Trade replication
+    # ------------------------------------------------------------------
+
+    def _build_order_templates(self):
+        constant = (b'{"mt5_new_order":1,"loginid":"'
+                    + str(self.destination_loginid or "").encode()
+                    + b'","login":"'
+                    + str(self.destination_mt5_login).encode() + b'"')
+        self._trade_tmpl = (constant + b',"symbol":"%b","type":%b,'
+                            b'"volume":%b,"price":%b,"req_id":%b}')
+        self._order_tmpl = (constant + b',"symbol":"%b","type":%b,'
+                            b'"volume":%b,"price":%b,"stop_loss":%b,'
+                            b'"take_profit":%b,"req_id":%b}')
+
+    async def replicate_mt5_trade(self, position):
+        if self._trade_tmpl is None:
+            logger.warning("Destination not ready, skipping trade copy")
+            return
+        req_id = next(self._req_id)
+        msg = self._trade_tmpl % (
+            position["symbol"].encode(),
+            _jnum(position["type"]),
+            _jnum(round(position["volume"] * self.lot_multiplier, 2)),
+            _jnum(position["price"]),
+            _jnum(req_id),
+        )
+        logger.debug("Replicating trade: %s", position["symbol"])
+        self._queue_order(req_id, msg)
+
+    async def replicate_mt5_order(self, order):
+        if self._order_tmpl is None:
+            logger.warning("Destination not ready, skipping order copy")
+            return
+        req_id = next(self._req_id)
+        msg = self._order_tmpl % (
+            order["symbol"].encode(),
+            _jnum(order["type"]),
+            _jnum(round(order["volume"] * self.lot_multiplier, 2)),
+            _jnum(order["price"]),
+            _jnum(order.get("stop_loss")),
+            _jnum(order.get("take_profit")),
+            _jnum(req_id),
+        )
+        logger.debug("Replicating order: %s", order["symbol"])
+        self._queue_order(req_id, msg)
+
+    def _queue_order(self, req_id, payload):
+        try:
+            self._pending_orders.put_nowait((req_id, payload))
+        except asyncio.QueueFull:
+            # Shed the oldest order rather than stalling or crashing the
+            # caller; a full queue means the destination is far behind.
+            self._pending_orders.get_nowait()
+            self._pending_orders.put_nowait((req_id, payload))
+            logger.warning("Order queue full, dropped oldest order")
+
+    async def _order_sender(self):
+        """Flush queued orders in batches on a single wakeup."""
+        while not self.stop_event.is_set():
+            batch = [await self._pending_orders.get()]
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._pending_orders.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            # Yield once so anything enqueued in this tick joins the batch.
+            await asyncio.sleep(0)
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._pending_orders.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            req_ids = [req_id for req_id, _ in batch]
+            if self._same_user:
+                ws = self.source_ws
+                if ws is None:
+                    logger.warning(f"Connection down, dropping "
+                                   f"{len(batch)} queued order(s)")
+                    continue
+                futures = [self._expect_response(r) for r in req_ids]
+                try:
+                    for _, payload in batch:
+                        await ws.send(payload)
+                except (websockets.ConnectionClosed, OSError) as exc:
+                    logger.warning(f"Failed to send order batch: {exc}")
+                else:
+                    # The shared reader resolves these through on_message.
+                    await asyncio.wait(futures, timeout=self.ack_timeout)
+                self._reap_acks(req_ids)
+                continue
+            ws = await self._dest_pool.get()
+            futures = [self._expect_response(r) for r in req_ids]
+            try:
+                for _, payload in batch:
+                    await ws.send(payload)
+            except (websockets.ConnectionClosed, OSError) as exc:
+                logger.warning(f"Failed to send order batch: {exc}")
+                await ws.close()
+                self._reap_acks(req_ids)
+                continue
+            try:
+                # Nothing else reads pooled sockets, so pump replies
+                # through on_message until every ack has resolved.
+                while not all(future.done() for future in futures):
+                    raw = await asyncio.wait_for(
+                        ws.recv(), timeout=self.ack_timeout)
+                    await self.on_message(ws, raw)
+            except asyncio.TimeoutError:
+                missing = sum(not future.done() for future in futures)
+                logger.warning(f"Timed out waiting for {missing} "
+                               f"order ack(s)")
+            except (websockets.ConnectionClosed, OSError) as exc:
+                logger.warning(f"Connection lost awaiting acks: {exc}")
+                await ws.close()
+                ws = None
+            if ws is not None:
+                try:
+                    self._dest_pool.put_nowait(ws)
+                except asyncio.QueueFull:
+                    # The filler refilled the slot while this socket was
+                    # checked out; drop the extra rather than crash.
+                    await ws.close()
+            self._reap_acks(req_ids)
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def select_mt5_account(self, accounts, target_account_number):
+        """Pick an MT5 login from ``mt5_login_list``.
+
+        Deriv prefixes logins with MTD (demo) or MTR (real), so accept the
+        bare number, either prefixed form, or a suffix match.
+        """
+        if not accounts:
+            return None
+        resolved = self._account_cache.get(target_account_number)
+        if resolved is not None:
+            return resolved
+        if target_account_number:
+            target = str(target_account_number)
+            candidates = {target, f"MTD{target}", f"MTR{target}"}
+            for account in accounts:
+                account_login = str(account.get("login", ""))
+                if account_login in candidates \
+                        or account_login.endswith(target):
+                    self._account_cache[target_account_number] = \
+                        account_login
+                    return account_login
+            logger.warning(f"MT5 account {target_account_number} not found, "
+                           f"falling back to first account")
+        fallback = str(accounts[0].get("login", ""))
+        self._account_cache[target_account_number] = fallback
+        return fallback
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        await asyncio.gather(
+            self.run_socket(),
+            self._pool_filler(),
+            self.report_queue_depth(),
+            self._replicator(),
+            self._order_sender(),
+        )
+
+    def stop(self):
+        self.stop_event.set()
+
+
+async def main():
+    bot = DerivMT5CopyTradingBot(
+        app_id=os.environ.get("DERIV_APP_ID", "1089"),
+        source_token=os.environ.get("DERIV_SOURCE_TOKEN", ""),
+        destination_token=os.environ.get("DERIV_DESTINATION_TOKEN", ""),
+        source_mt5_account=os.environ.get("SOURCE_MT5_ACCOUNT"),
+        destination_mt5_account=os.environ.get("DESTINATION_MT5_ACCOUNT"),
+    )
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows has no loop signal handlers; KeyboardInterrupt
+            # propagates through asyncio.run instead.
+            break
+    runner = asyncio.create_task(bot.start())
+    # Block without waking until a signal arrives, then shut down cleanly.
+    await stop.wait()
+    bot.stop()
+    runner.cancel()
+    try:
+        await runner
+    except asyncio.CancelledError:
+        pass
+
+
+if __name__ == "__main__":
+    if uvloop is not None:
+        uvloop.install()
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""Contract copier sketch on python-deriv-api.
+
+Places a trade on each destination account, scaled by balance, and can
+update or close the copies later. Importing this module has no side
+effects; run it directly to execute the example flow.
+"""
+
+import asyncio
+import os
+
+from deriv_api import DerivAPI
+
+APP_ID = os.environ.get("DERIV_APP_ID", "1089")
+API_TOKEN = os.environ.get("DERIV_API_TOKEN", "")
+
+# account id -> latest balance, kept fresh by the balance subscriptions
+# so the trade path never round-trips for a balance.
+_balances = {}
+
+
+def _on_balance(message):
+    balance = message.get("balance") or {}
+    loginid = balance.get("loginid")
+    if loginid:
+        _balances[loginid] = float(balance.get("balance", 0))
+
+
+async def subscribe_balances(api, account_ids):
+    """Subscribe once per account; pushed updates keep _balances fresh."""
+    for account_id in account_ids:
+        source = await api.subscribe({"balance": 1, "account": account_id})
+        source.subscribe(_on_balance)
+
+
+async def get_balance(api, account_id):
+    cached = _balances.get(account_id)
+    if cached is not None:
+        return cached
+    response = await api.call({"balance": 1, "account": account_id})
+    balance = float(response["balance"]["balance"])
+    _balances[account_id] = balance
+    return balance
+
+
+async def _copy_one(api, destination, source_balance, contract_type,
+                    symbol, amount, duration, duration_unit):
+    destination_balance = await get_balance(api, destination)
+    if source_balance > 0:
+        scaled_amount = round(
+            amount * destination_balance / source_balance, 2)
+    else:
+        scaled_amount = amount
+    proposal = await api.call({
+        "proposal": 1,
+        "amount": scaled_amount,
+        "basis": "stake",
+        "contract_type": contract_type,
+        "currency": "USD",
+        "duration": duration,
+        "duration_unit": duration_unit,
+        "symbol": symbol,
+        "account": destination,
+    })
+    buy = await api.call({
+        "buy": proposal["proposal"]["id"],
+        "price": scaled_amount,
+        "account": destination,
+    })
+    print(f"Placed {contract_type} {symbol} on {destination} "
+          f"for {scaled_amount}")
+    return buy["buy"]["contract_id"]
+
+
+async def place_new_trade(api, source_account_id, destination_account_ids,
+                          contract_type, symbol, amount, duration,
+                          duration_unit):
+    """Copy a trade onto every destination; returns account -> contract id.
+
+    All destinations are fired concurrently so the total latency is the
+    slowest round-trip rather than the sum of them.
+    """
+    source_balance = await get_balance(api, source_account_id)
+    results = await asyncio.gather(
+        *(_copy_one(api, destination, source_balance, contract_type,
+                    symbol, amount, duration, duration_unit)
+          for destination in destination_account_ids),
+        return_exceptions=True,
+    )
+    contract_ids = {}
+    for destination, result in zip(destination_account_ids, results):
+        if isinstance(result, Exception):
+            print(f"Failed to place trade on {destination}: {result}")
+        else:
+            contract_ids[destination] = result
+    return contract_ids
+
+
+async def update_existing_trade(api, contract_ids, limit_order):
+    """Push a stop-loss/take-profit change to every copied contract."""
+    results = await asyncio.gather(
+        *(api.call({
+            "contract_update": 1,
+            "contract_id": contract_id,
+            "limit_order": limit_order,
+            "account": destination,
+        }) for destination, contract_id in contract_ids.items()),
+        return_exceptions=True,
+    )
+    for destination, result in zip(contract_ids, results):
+        if isinstance(result, Exception):
+            print(f"Failed to update contract on {destination}: {result}")
+
+
+async def close_existing_trade(api, contract_ids):
+    """Sell every copied contract at market."""
+    results = await asyncio.gather(
+        *(api.call({
+            "sell": contract_id,
+            "price": 0,
+            "account": destination,
+        }) for destination, contract_id in contract_ids.items()),
+        return_exceptions=True,
+    )
+    for destination, result in zip(contract_ids, results):
+        if isinstance(result, Exception):
+            print(f"Failed to close contract on {destination}: {result}")
+
+
+async def main():
+    api = DerivAPI(app_id=APP_ID)
+    await api.authorize(API_TOKEN)
+    source_account_id = os.environ.get("DERIV_SOURCE_ACCOUNT", "")
+    destination_account_ids = [
+        account for account in
+        os.environ.get("DERIV_DESTINATION_ACCOUNTS", "").split(",")
+        if account
+    ]
+    await subscribe_balances(
+        api, [source_account_id] + destination_account_ids)
+    # Example: copy a 5-tick CALL on R_100 onto every destination.
+    contract_ids = await place_new_trade(
+        api, source_account_id, destination_account_ids,
+        contract_type="CALL", symbol="R_100", amount=10,
+        duration=5, duration_unit="t")
+    print(f"Copied contracts: {contract_ids}")
+    await api.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,172 @@
+"""Replicates contracts from user A's Deriv account onto user B's.
+
+Listens to user A's transaction stream; every buy is mirrored on user
+B's account and every sell closes the mirrored contract.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+
+from deriv_api import DerivAPI
+
+APP_ID = os.environ.get("DERIV_APP_ID", "1089")
+USER_A_TOKEN = os.environ.get("DERIV_USER_A_TOKEN", "")
+USER_B_TOKEN = os.environ.get("DERIV_USER_B_TOKEN", "")
+USER_A_LOGINID = os.environ.get("DERIV_USER_A_LOGINID", "")
+USER_B_LOGINID = os.environ.get("DERIV_USER_B_LOGINID", "")
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# user A contract id -> (user B contract id, inserted-at). Size-bounded
+# and TTL-swept so buys that never pair (timeouts, errors, manual
+# closes) cannot leak memory in a long-running process.
+contract_mapping = OrderedDict()
+CONTRACT_CAP = 10_000
+CONTRACT_TTL = 6 * 3600
+SWEEP_INTERVAL = 60
+
+QUEUE_SIZE = 256
+WORKER_COUNT = 4
+
+
+def map_contract(cid_a, cid_b):
+    contract_mapping[cid_a] = (cid_b, time.time())
+    contract_mapping.move_to_end(cid_a)
+    if len(contract_mapping) > CONTRACT_CAP:
+        contract_mapping.popitem(last=False)
+
+
+async def sweep_contracts():
+    """Periodically drop mappings older than the TTL."""
+    while True:
+        await asyncio.sleep(SWEEP_INTERVAL)
+        cutoff = time.time() - CONTRACT_TTL
+        swept = 0
+        while contract_mapping:
+            cid_a = next(iter(contract_mapping))
+            if contract_mapping[cid_a][1] >= cutoff:
+                break
+            del contract_mapping[cid_a]
+            swept += 1
+        if swept:
+            logger.info(f"Swept {swept} expired contract mapping(s)")
+
+
+async def process_buy_transaction(api, transaction):
+    cid_a = transaction["contract_id"]
+    details = await api.call({
+        "proposal_open_contract": 1,
+        "contract_id": cid_a,
+    })
+    contract = details.get("proposal_open_contract", {})
+    buy_params = {
+        "buy": 1,
+        "price": float(transaction.get("amount", 0)),
+        "parameters": {
+            "contract_type": contract.get("contract_type"),
+            "symbol": contract.get("underlying"),
+            "amount": float(transaction.get("amount", 0)),
+            "basis": "stake",
+            "currency": contract.get("currency", "USD"),
+        },
+        "loginid": USER_B_LOGINID,
+    }
+    buy = await api.call(buy_params)
+    map_contract(cid_a, buy["buy"]["contract_id"])
+    logger.info(f"Copied contract {cid_a} -> {buy['buy']['contract_id']}")
+
+
+async def process_sell_transaction(api, transaction):
+    mapped = contract_mapping.pop(transaction["contract_id"], None)
+    if mapped is None:
+        # With per-contract sharding this means the buy predates the bot
+        # or was swept/never copied; say so rather than vanish silently.
+        logger.warning(f"No copy recorded for contract "
+                       f"{transaction['contract_id']}, nothing to close")
+        return
+    cid_b, _ = mapped
+    await api.call({"sell": cid_b, "price": 0, "loginid": USER_B_LOGINID})
+    logger.info(f"Closed copied contract {cid_b}")
+
+
+async def listener(api, queues):
+    """Fast reader: keeps draining the stream while workers replicate.
+
+    Messages are sharded onto a per-worker queue by contract id, so the
+    buy and sell of the same contract always land on the same worker in
+    order — a sell can never overtake its buy and miss the mapping.
+    """
+    while True:
+        message = await api.listen()
+        transaction = message.get("transaction")
+        if not transaction:
+            continue
+        # Belt and braces on top of the loginid-scoped subscription: a
+        # push for user B here would be one of our own copies, and
+        # replicating it again would loop.
+        loginid = transaction.get("loginid")
+        if loginid is not None and loginid != USER_A_LOGINID:
+            continue
+        contract_id = transaction.get("contract_id")
+        q = queues[hash(contract_id) % len(queues)]
+        try:
+            q.put_nowait(transaction)
+        except asyncio.QueueFull:
+            # Shed the oldest message so ingest never stalls behind a
+            # burst of slow replications.
+            q.get_nowait()
+            q.put_nowait(transaction)
+            logger.warning("Message queue full, dropped oldest message")
+
+
+async def worker(api, q):
+    while True:
+        transaction = await q.get()
+        action = transaction.get("action")
+        try:
+            if action == "buy":
+                await process_buy_transaction(api, transaction)
+            elif action == "sell":
+                await process_sell_transaction(api, transaction)
+        except Exception as exc:
+            logger.error(f"Failed to replicate {action}: {exc}")
+        q.task_done()
+
+
+async def replicate_trades():
+    # One connection carries both users, authorized together with a
+    # multi-token authorize so neither login "owns" the session, and
+    # outbound calls plus the subscription are scoped explicitly by
+    # loginid. Halves the TCP/TLS state of the old two-client setup.
+    api = DerivAPI(app_id=APP_ID)
+    await api.authorize({
+        "authorize": "MULTI",
+        "tokens": [USER_A_TOKEN, USER_B_TOKEN],
+    })
+    # Scoped to user A so B's copied buys never re-enter the stream.
+    await api.subscribe({
+        "transaction": 1,
+        "subscribe": 1,
+        "loginid": USER_A_LOGINID,
+    })
+    queues = [asyncio.Queue(maxsize=QUEUE_SIZE)
+              for _ in range(WORKER_COUNT)]
+    await asyncio.gather(
+        listener(api, queues),
+        *(worker(api, q) for q in queues),
+    )
+
+
+async def main():
+    await asyncio.gather(replicate_trades(), sweep_contracts())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
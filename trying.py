@@ -0,0 +1,62 @@
+"""Minimal push-based position copier sketch.
+
+Earlier revisions polled the open-positions portfolio every 5 seconds
+and re-copied everything it returned, which duplicated trades on every
+pass and added up to 5 seconds of replication latency. This version
+subscribes to the transaction stream instead: new contracts arrive as
+pushes and a seen set suppresses duplicates.
+"""
+
+import asyncio
+import os
+
+from deriv_api import DerivAPI
+
+APP_ID = os.environ.get("DERIV_APP_ID", "1089")
+API_TOKEN = os.environ.get("DERIV_API_TOKEN", "")
+DESTINATION_TOKEN = os.environ.get("DERIV_DESTINATION_TOKEN", "")
+
+
+async def copy_trade(api, transaction):
+    details = await api.call({
+        "proposal_open_contract": 1,
+        "contract_id": transaction["contract_id"],
+    })
+    contract = details.get("proposal_open_contract", {})
+    buy = await api.call({
+        "buy": 1,
+        "price": float(transaction.get("amount", 0)),
+        "parameters": {
+            "contract_type": contract.get("contract_type"),
+            "symbol": contract.get("underlying"),
+            "amount": float(transaction.get("amount", 0)),
+            "basis": "stake",
+            "currency": contract.get("currency", "USD"),
+        },
+    })
+    print(f"Copied contract {transaction['contract_id']} -> "
+          f"{buy['buy']['contract_id']}")
+
+
+async def main():
+    api = DerivAPI(app_id=APP_ID)
+    await api.authorize(API_TOKEN)
+    await api.subscribe({"transaction": 1, "subscribe": 1})
+    seen = set()
+    while True:
+        message = await api.listen()
+        transaction = message.get("transaction")
+        if not transaction or transaction.get("action") != "buy":
+            continue
+        contract_id = transaction.get("contract_id")
+        if contract_id in seen:
+            continue
+        seen.add(contract_id)
+        try:
+            await copy_trade(api, transaction)
+        except Exception as exc:
+            print(f"Failed to copy contract {contract_id}: {exc}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())